@@ -2,10 +2,10 @@ import streamlit as st
 import pandas as pd
 import snowflake.connector
 import openai
+import httpx
 import os
+import time
 from dotenv import load_dotenv
-from streamlit_ace import st_ace
-import json
 import re
 import io
 
@@ -27,7 +27,21 @@ if not api_key:
     st.info("💡 If deploying on Streamlit Cloud, go to Settings → Secrets and add your OpenAI API key.")
     st.stop()
 
-client = openai.OpenAI(api_key=api_key)
+@st.cache_resource(show_spinner=False)
+def get_openai_client():
+    """Create and return a cached OpenAI client with a bounded connection pool.
+
+    Deliberately synchronous: the cached client outlives any single script
+    run, and a sync httpx pool keeps its keep-alive connections usable across
+    runs (an async pool would be bound to a per-call event loop).
+    """
+    return openai.OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=30
+        )
+    )
 
 # Snowflake connection configuration
 SNOWFLAKE_CONFIG = {
@@ -68,19 +82,31 @@ Tables available:
 IMPORTANT: Use the correct table aliases and column names. Do NOT reference columns that don't exist in the specified table.
 """
 
+def _parse_schema(schema_text):
+    """Parse the schema description into {table_alias: set(column_names)}"""
+    schema = {}
+    alias = None
+    for line in schema_text.splitlines():
+        match = re.search(r'\(alias: (\w)\)', line)
+        if match:
+            alias = match.group(1)
+            schema[alias] = set()
+        elif alias and line.lstrip().startswith('-') and ':' in line:
+            schema[alias].update(re.findall(r'\b[A-Z][A-Z_]+\b', line.split(':', 1)[1]))
+    return schema
+
+# Structured view of DATABASE_SCHEMA, built once at import and used for
+# client-side column validation before a query ever reaches Snowflake
+SCHEMA = _parse_schema(DATABASE_SCHEMA)
+
+@st.cache_resource(show_spinner=False)
 def get_snowflake_connection():
-    """Create and return a Snowflake connection"""
-    try:
-        conn = snowflake.connector.connect(**SNOWFLAKE_CONFIG)
-        return conn
-    except Exception as e:
-        st.error(f"Failed to connect to Snowflake: {str(e)}")
-        return None
+    """Create and return a cached Snowflake connection shared across reruns"""
+    return snowflake.connector.connect(**SNOWFLAKE_CONFIG, client_session_keep_alive=True)
 
-def natural_language_to_sql(natural_query):
-    """Convert natural language to SQL using OpenAI"""
-    
-    system_prompt = f"""You are a SQL expert specializing in Snowflake SQL. Convert the user's natural language query into valid Snowflake SQL.
+# Interpolated once at import so every call reuses the identical prompt
+# (also keeps the prefix byte-stable for OpenAI's prompt caching)
+SYSTEM_PROMPT = f"""You are a SQL expert specializing in Snowflake SQL. Convert the user's natural language query into valid Snowflake SQL.
 
 Database Schema:
 {DATABASE_SCHEMA}
@@ -139,103 +165,233 @@ ORDER BY LICENSED_STATES DESC, c.FIRST_NAME, c.LAST_NAME
 IMPORTANT: Always use clean LIKE patterns like '%keyword%' and avoid double quotes or malformed patterns.
 """
 
+# Strips a leading ```sql / ``` fence and the trailing ``` in one pass
+_FENCE_RE = re.compile(r"^\s*```(?:sql)?\s*|\s*```\s*$", re.IGNORECASE | re.MULTILINE)
+
+def _nl2sql(natural_query):
+    """Call OpenAI with retry/backoff and return the completion text"""
+    for attempt in range(3):
+        try:
+            # Responses API keeps the long instructions prefix byte-identical
+            # across calls so OpenAI's automatic prompt cache applies
+            response = get_openai_client().responses.create(
+                model="gpt-4o-mini",
+                instructions=SYSTEM_PROMPT,
+                input=natural_query,
+                max_output_tokens=500,
+                temperature=0.1
+            )
+            return response.output_text.strip()
+        except Exception:
+            if attempt == 2:
+                raise
+            # Exponential backoff before retrying the API call
+            time.sleep(2 ** attempt)
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _generate_sql(natural_query):
+    """Call OpenAI and return the generated SQL (raises on API failure)"""
+    sql_query = _nl2sql(natural_query)
+
+    # Clean up the response to extract just the SQL
+    return _FENCE_RE.sub("", sql_query).strip()
+
+def natural_language_to_sql(natural_query):
+    """Convert natural language to SQL using OpenAI"""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": natural_query},
-            ],
-            max_tokens=1000,
-            temperature=0.1
-        )
-        
-        sql_query = response.choices[0].message.content.strip()
-        
-        # Clean up the response to extract just the SQL
-        if sql_query.startswith("```sql"):
-            sql_query = sql_query[6:]
-        if sql_query.endswith("```"):
-            sql_query = sql_query[:-3]
-        
-        return sql_query.strip()
-    
+        return _generate_sql(natural_query)
     except Exception as e:
         st.error(f"Error generating SQL: {str(e)}")
         return None
 
-def execute_sql_query(sql_query):
-    """Execute SQL query and return results"""
+@st.cache_data(ttl=600, max_entries=128, show_spinner="Executing query…")
+def _run_sql(sql_query, max_rows):
+    """Fetch a query result as a DataFrame via the cached connection (raises on failure)"""
     conn = get_snowflake_connection()
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
+    with conn.cursor() as cursor:
+        # Enforce the cap server-side as well
+        cursor.execute(f"ALTER SESSION SET ROWS_PER_RESULTSET = {int(max_rows)}")
+
+        # Push the row cap into the SQL unless the query already limits itself
+        if not re.search(r'\bLIMIT\b', sql_query, re.IGNORECASE):
+            sql_query = f"{sql_query.rstrip().rstrip(';')} LIMIT {int(max_rows)}"
+
         cursor.execute(sql_query)
-        
-        # Fetch results
-        results = cursor.fetchall()
-        column_names = [desc[0] for desc in cursor.description]
-        
-        # Create DataFrame
-        df = pd.DataFrame(results, columns=column_names)
-        
-        # Fix data type issues for Streamlit display
-        df = fix_dataframe_for_streamlit(df)
-        
-        cursor.close()
-        conn.close()
-        
-        return df
-    
-    except Exception as e:
-        st.error(f"Error executing SQL: {str(e)}")
-        if conn:
-            conn.close()
-        return None
+
+        try:
+            # Arrow path: stream result batches so peak memory stays bounded,
+            # skipping per-value Python object materialization
+            batches = []
+            fetched = 0
+            for batch in cursor.fetch_pandas_batches():
+                batches.append(batch)
+                fetched += len(batch)
+                if fetched >= max_rows:
+                    break
+            if batches:
+                df = pd.concat(batches, ignore_index=True).head(max_rows)
+            else:
+                df = cursor.fetch_pandas_all()
+        except snowflake.connector.errors.NotSupportedError:
+            # Fall back to row fetching for non-Arrow results
+            results = cursor.fetchmany(int(max_rows))
+            column_names = [desc[0] for desc in cursor.description]
+            df = pd.DataFrame(results, columns=column_names)
+
+    # Fix data type issues for Streamlit display
+    return fix_dataframe_for_streamlit(df)
+
+def execute_sql_query(sql_query, max_rows=10_000):
+    """Execute SQL query and return results"""
+    for attempt in range(2):
+        try:
+            return _run_sql(sql_query, max_rows)
+
+        except snowflake.connector.errors.OperationalError as e:
+            # The cached connection went stale — drop it and retry once
+            get_snowflake_connection.clear()
+            if attempt == 1:
+                st.error(f"Failed to connect to Snowflake: {str(e)}")
+                return None
+
+        except Exception as e:
+            st.error(f"Error executing SQL: {str(e)}")
+            return None
 
 def fix_dataframe_for_streamlit(df):
     """Fix dataframe data types to be compatible with Streamlit and PyArrow"""
-    
-    # Convert problematic data types
+
+    # Promote object columns to proper string/numeric/boolean dtypes;
+    # datetime columns come through as datetime64 and need no further work
+    df = df.convert_dtypes()
+
     for col in df.columns:
-        # Handle object/string columns that might cause PyArrow issues
-        if df[col].dtype == 'object':
-            # Convert to string, handling None/NaN values
-            df[col] = df[col].astype(str).replace('nan', '').replace('None', '')
-        
-        # Handle datetime columns
-        elif 'datetime' in str(df[col].dtype):
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-        # Handle numeric columns with mixed types
-        elif df[col].dtype == 'object':
-            try:
-                # Try to convert to numeric
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            except:
-                # If conversion fails, keep as string
-                df[col] = df[col].astype(str).replace('nan', '').replace('None', '')
-    
+        # Anything still object-typed gets a single vectorized masked cast
+        if pd.api.types.is_object_dtype(df[col]):
+            df[col] = df[col].where(df[col].notna(), '').astype('string')
+
     return df
 
+@st.cache_data(show_spinner=False)
+def _df_deep_bytes(df):
+    """Deep memory usage of a DataFrame, computed once per result set"""
+    return int(df.memory_usage(deep=True).sum())
+
+@st.cache_data(show_spinner=False)
+def _preview(df):
+    """Precompute the data-preview frames once per result set"""
+    missing_data = df.isnull().sum().to_frame('Missing Count')
+    missing_data['Missing Percentage'] = (missing_data['Missing Count'] / len(df)) * 100
+    return df.head(10), df.dtypes.astype(str).to_frame('Data Type'), missing_data
+
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df):
+    """Serialize a DataFrame to CSV bytes once per result set"""
+    return df.to_csv(index=False).encode()
+
+@st.cache_data(show_spinner=False)
+def _to_xlsx_bytes(df):
+    """Serialize a DataFrame to an Excel workbook once per result set"""
+    excel_buffer = io.BytesIO()
+    # No constant_memory here: it flushes rows as the writer passes them, but
+    # pandas emits cells column-by-column, so later columns would be dropped
+    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Query Results')
+    return excel_buffer.getvalue()
+
+# Precompiled validation patterns — word boundaries avoid false positives
+# on column names like CREATED_AT or TRUNCATED_VALUE
+_DANGEROUS_RE = re.compile(r"\b(DROP|DELETE|TRUNCATE|ALTER|CREATE|GRANT|REVOKE)\b", re.IGNORECASE)
+_SELECT_RE = re.compile(r"\bSELECT\b", re.IGNORECASE)
+
+@st.cache_data(show_spinner=False)
+def _to_parquet_bytes(df):
+    """Serialize a DataFrame to compressed Parquet once per result set"""
+    buf = io.BytesIO()
+    df.to_parquet(buf, engine='pyarrow', compression='zstd')
+    return buf.getvalue()
+
 def validate_sql_query(sql_query):
     """Basic SQL validation"""
     # Check for dangerous keywords
-    dangerous_keywords = ['DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE', 'GRANT', 'REVOKE']
-    sql_upper = sql_query.upper()
-    
-    for keyword in dangerous_keywords:
-        if keyword in sql_upper:
-            return False, f"Query contains potentially dangerous keyword: {keyword}"
-    
+    match = _DANGEROUS_RE.search(sql_query)
+    if match:
+        return False, f"Query contains potentially dangerous keyword: {match.group(1).upper()}"
+
     # Check for SELECT statement
-    if 'SELECT' not in sql_upper:
+    if not _SELECT_RE.search(sql_query):
         return False, "Query must contain a SELECT statement"
-    
+
+    # Pre-flight column check — catches obvious typos without a Snowflake round trip
+    for alias, column in re.findall(r'\b([cop])\.([A-Za-z_]+)\b', sql_query):
+        if column.upper() not in SCHEMA.get(alias, set()):
+            return False, f"Unknown column {alias}.{column} for table alias '{alias}'"
+
     return True, "Query appears safe"
 
+@st.fragment
+def _render_results():
+    """Results section — a fragment so its interactions rerun only this block"""
+    if 'query_results' not in st.session_state or st.session_state.query_results is None:
+        return
+
+    st.markdown("---")
+    st.subheader("Query Results")
+    
+    results_df = st.session_state.query_results
+    
+    # Display results info
+    col_info1, col_info2, col_info3 = st.columns(3)
+    with col_info1:
+        st.metric("Total Rows", len(results_df))
+    with col_info2:
+        st.metric("Total Columns", len(results_df.columns))
+    with col_info3:
+        st.metric("Memory Usage", f"{_df_deep_bytes(results_df) / 1024:.1f} KB")
+    
+    # Display the dataframe
+    st.dataframe(results_df, use_container_width=True)
+    
+    # Download options
+    col_dl1, col_dl2, col_dl3 = st.columns(3)
+    with col_dl1:
+        st.download_button(
+            label="📥 Download CSV",
+            data=_to_csv_bytes(results_df),
+            file_name="query_results.csv",
+            mime="text/csv"
+        )
+
+    with col_dl2:
+        st.download_button(
+            label="📥 Download Excel",
+            data=_to_xlsx_bytes(results_df),
+            file_name="query_results.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    with col_dl3:
+        st.download_button(
+            label="📥 Download Parquet",
+            data=_to_parquet_bytes(results_df),
+            file_name="query_results.parquet",
+            mime="application/octet-stream"
+        )
+    
+    # Show sample data analysis
+    st.subheader("Data Preview")
+    head_df, dtypes_df, missing_data = _preview(results_df)
+    tab1, tab2, tab3 = st.tabs(["First 10 Rows", "Data Types", "Missing Values"])
+
+    with tab1:
+        st.dataframe(head_df, use_container_width=True)
+
+    with tab2:
+        st.dataframe(dtypes_df, use_container_width=True)
+
+    with tab3:
+        st.dataframe(missing_data, use_container_width=True)
+
 def main():
     st.title("❄️ GradToHired Database Automation")
     st.markdown("Convert natural language to SQL and query your Snowflake database")
@@ -243,7 +399,17 @@ def main():
     # Sidebar for configuration
     with st.sidebar:
         st.header("Configuration")
-        
+
+        max_rows = st.number_input(
+            "Max rows",
+            min_value=100,
+            max_value=1_000_000,
+            value=10_000,
+            step=1000,
+            help="Row cap applied to queries without an explicit LIMIT"
+        )
+
+
         # Example queries
         st.subheader("Example Queries")
         example_queries = [
@@ -301,7 +467,7 @@ def main():
                 
                 if st.button("🔍 Execute Query", type="secondary"):
                     with st.spinner("Executing query..."):
-                        results_df = execute_sql_query(sql_query)
+                        results_df = execute_sql_query(sql_query, max_rows)
                         
                         if results_df is not None:
                             st.session_state.query_results = results_df
@@ -313,61 +479,7 @@ def main():
                 st.warning("Please review and fix the SQL query before execution")
     
     # Results section
-    if 'query_results' in st.session_state and st.session_state.query_results is not None:
-        st.markdown("---")
-        st.subheader("Query Results")
-        
-        results_df = st.session_state.query_results
-        
-        # Display results info
-        col_info1, col_info2, col_info3 = st.columns(3)
-        with col_info1:
-            st.metric("Total Rows", len(results_df))
-        with col_info2:
-            st.metric("Total Columns", len(results_df.columns))
-        with col_info3:
-            st.metric("Memory Usage", f"{results_df.memory_usage(deep=True).sum() / 1024:.1f} KB")
-        
-        # Display the dataframe
-        st.dataframe(results_df, use_container_width=True)
-        
-        # Download options
-        col_dl1, col_dl2 = st.columns(2)
-        with col_dl1:
-            csv = results_df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name="query_results.csv",
-                mime="text/csv"
-            )
-        
-        with col_dl2:
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                results_df.to_excel(writer, index=False, sheet_name='Query Results')
-            excel_data = excel_buffer.getvalue()
-            st.download_button(
-                label="📥 Download Excel",
-                data=excel_data,
-                file_name="query_results.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        
-        # Show sample data analysis
-        st.subheader("Data Preview")
-        tab1, tab2, tab3 = st.tabs(["First 10 Rows", "Data Types", "Missing Values"])
-        
-        with tab1:
-            st.dataframe(results_df.head(10), use_container_width=True)
-        
-        with tab2:
-            st.dataframe(results_df.dtypes.to_frame('Data Type'), use_container_width=True)
-        
-        with tab3:
-            missing_data = results_df.isnull().sum().to_frame('Missing Count')
-            missing_data['Missing Percentage'] = (missing_data['Missing Count'] / len(results_df)) * 100
-            st.dataframe(missing_data, use_container_width=True)
+    _render_results()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,11 +1,18 @@
 import streamlit as st
 import pandas as pd
-import snowflake.connector
-import openai
+import hashlib
+import json
 import os
+import queue
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
 from dotenv import load_dotenv
-import io
-from nurse_practitioner_search import NursePractitionerSearch
+
+# Heavy third-party modules (snowflake.connector, openai, the NP search
+# module) are imported lazily where they're first needed so cold starts
+# don't pay their import cost up front.
 
 # Load environment variables
 load_dotenv()
@@ -25,12 +32,13 @@ try:
     if not api_key:
         # Fallback to environment variables (for local development)
         api_key = os.getenv("OPENAI_API_KEY")
-    
+
     if not api_key:
         st.error("❌ OPENAI_API_KEY not found!")
         st.info("💡 **Local Development**: Add to .env file | **Streamlit Cloud**: Add to Settings → Secrets")
         st.stop()
-    
+
+    import openai
     client = openai.OpenAI(api_key=api_key)
 except Exception as e:
     st.error(f"❌ Error initializing OpenAI client: {str(e)}")
@@ -38,24 +46,35 @@ except Exception as e:
     st.stop()
 
 # Snowflake connection configuration
+@dataclass(frozen=True)
+class Config:
+    """Snowflake settings, read once at import and frozen"""
+    user: str
+    password: str
+    account: str
+    warehouse: str
+    database: str
+    schema: str
+
+def _read_setting(key):
+    """Streamlit secrets first (deployed apps), then env (local development)"""
+    return st.secrets.get(key) or os.getenv(key)
+
 try:
-    # Try Streamlit secrets first (for deployed apps)
-    SNOWFLAKE_CONFIG = {
-        "user": st.secrets.get("SNOWFLAKE_USER") or os.getenv("SNOWFLAKE_USER"),
-        "password": st.secrets.get("SNOWFLAKE_PASSWORD") or os.getenv("SNOWFLAKE_PASSWORD"),
-        "account": st.secrets.get("SNOWFLAKE_ACCOUNT") or os.getenv("SNOWFLAKE_ACCOUNT"),
-        "warehouse": st.secrets.get("SNOWFLAKE_WAREHOUSE") or os.getenv("SNOWFLAKE_WAREHOUSE"),
-        "database": st.secrets.get("SNOWFLAKE_DATABASE") or os.getenv("SNOWFLAKE_DATABASE"),
-        "schema": st.secrets.get("SNOWFLAKE_SCHEMA") or os.getenv("SNOWFLAKE_SCHEMA")
-    }
-    
+    CFG = Config(**{field: _read_setting(f"SNOWFLAKE_{field.upper()}")
+                    for field in Config.__dataclass_fields__})
+
     # Check if any required values are missing
-    missing_values = [key for key, value in SNOWFLAKE_CONFIG.items() if not value]
+    missing_values = [f"SNOWFLAKE_{field.upper()}"
+                      for field, value in asdict(CFG).items() if not value]
     if missing_values:
         st.error(f"❌ Missing Snowflake configuration: {', '.join(missing_values)}")
         st.info("💡 **Local Development**: Add to .env file | **Streamlit Cloud**: Add to Settings → Secrets")
         st.stop()
-        
+
+    # Field names line up with snowflake.connector.connect kwargs
+    SNOWFLAKE_CONFIG = asdict(CFG)
+
 except Exception as e:
     st.error(f"❌ Error loading Snowflake configuration: {str(e)}")
     st.info("💡 **Local Development**: Add to .env file | **Streamlit Cloud**: Add to Settings → Secrets")
@@ -90,22 +109,57 @@ Tables available:
 IMPORTANT: Use the correct table aliases and column names. Do NOT reference columns that don't exist in the specified table.
 """
 
-def get_snowflake_connection():
-    """Create and return a Snowflake connection"""
-    try:
-        conn = snowflake.connector.connect(**SNOWFLAKE_CONFIG)
-        return conn
-    except Exception as e:
-        st.error(f"Failed to connect to Snowflake: {str(e)}")
-        return None
+def _parse_table_columns(schema_text):
+    """Parse the schema description into {table_name: [column, ...]}"""
+    tables = {}
+    current = None
+    for line in schema_text.splitlines():
+        match = re.search(r'(\S+\.\S+\.\S+) \(alias: \w\)', line)
+        if match:
+            current = match.group(1).rsplit('.', 1)[-1]
+            tables[current] = []
+        elif current and line.lstrip().startswith('-') and ':' in line:
+            tables[current].extend(re.findall(r'\b[A-Z][A-Z_]+\b', line.split(':', 1)[1]))
+    return tables
 
-def natural_language_to_sql(natural_query):
-    """Convert natural language to SQL using OpenAI"""
-    
-    system_prompt = f"""You are a SQL expert specializing in Snowflake SQL. Convert the user's natural language query into valid Snowflake SQL.
+# Structured column lists backing the get_table_columns tool — the model
+# fetches columns on demand instead of receiving the full schema text
+TABLE_COLUMNS = _parse_table_columns(DATABASE_SCHEMA)
+
+def get_table_columns(table_name):
+    """Return the column list for a table (backs the model-facing tool)"""
+    return TABLE_COLUMNS.get(table_name.lower().rsplit('.', 1)[-1], [])
+
+_SQL_TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "get_table_columns",
+        "description": "Return the list of columns available on a table",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Table name, e.g. userprofiles.public.contact_search_dz"
+                }
+            },
+            "required": ["table_name"]
+        }
+    }
+}]
+
+# Interpolated once at import so every call reuses the identical prompt
+# (byte-stable prefix keeps OpenAI's automatic prompt cache effective)
+SYSTEM_PROMPT = """You are a SQL expert specializing in Snowflake SQL. Convert the user's natural language query into valid Snowflake SQL.
 
 Database Schema:
-{DATABASE_SCHEMA}
+Tables available (call the get_table_columns tool to discover the columns on each table before referencing them):
+
+1. userprofiles.public.contact_search_dz (alias: c) - contact, job, location, company, skills and LinkedIn data
+2. userprofiles.public.org_latest_copy (alias: o) - company, industry, headquarters and contact data
+3. userprofiles.public.per_latest_copy (alias: p) - person profile, contact, location, job and skills data
+
+IMPORTANT: Use the correct table aliases and column names. Do NOT reference columns that don't exist in the specified table.
 
 CRITICAL RULES:
 1. Use proper Snowflake SQL syntax
@@ -161,101 +215,212 @@ ORDER BY LICENSED_STATES DESC, c.FIRST_NAME, c.LAST_NAME
 IMPORTANT: Always use clean LIKE patterns like '%keyword%' and avoid double quotes or malformed patterns.
 """
 
+_SF_POOL_SIZE = 3
+
+# Hard ceiling on rows materialized client-side — Streamlit Cloud's memory
+# cap is easily blown by unbounded NP search results
+_MAX_RESULT_ROWS = 100_000
+
+@st.cache_resource(show_spinner=False)
+def _get_sf_pool():
+    """Create a small pool of persistent Snowflake connections with a keepalive thread"""
+    import snowflake.connector
+
+    pool = queue.Queue(maxsize=_SF_POOL_SIZE)
+    for _ in range(_SF_POOL_SIZE):
+        pool.put(snowflake.connector.connect(**SNOWFLAKE_CONFIG, client_session_keep_alive=True))
+
+    def _keepalive():
+        # Ping each idle connection every 4 minutes to dodge Snowflake's idle timeout
+        while True:
+            time.sleep(240)
+            for _ in range(_SF_POOL_SIZE):
+                try:
+                    conn = pool.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                except Exception:
+                    pass
+                finally:
+                    pool.put(conn)
+
+    threading.Thread(target=_keepalive, daemon=True).start()
+    return pool
+
+def natural_language_to_sql(natural_query):
+    """Convert natural language to SQL using OpenAI"""
+    # Deterministic cache key over everything that shapes the response;
+    # temperature=0.1 makes exact-match caching safe
+    prompt_hash = hashlib.sha256(
+        f"gpt-4o-mini\x00{SYSTEM_PROMPT}\x00{natural_query}".encode()
+    ).hexdigest()
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": natural_query}
-            ],
-            max_tokens=1000,
-            temperature=0.1
-        )
-        
-        sql_query = response.choices[0].message.content.strip()
-        
-        # Clean up the response to extract just the SQL
-        if sql_query.startswith("```sql"):
-            sql_query = sql_query[6:]
-        if sql_query.endswith("```"):
-            sql_query = sql_query[:-3]
-        
-        return sql_query.strip()
-    
+        return _cached_llm_sql(prompt_hash, natural_query)
     except Exception as e:
         st.error(f"Error generating SQL: {str(e)}")
         return None
 
-def execute_sql_query(sql_query):
-    """Execute SQL query and return results"""
-    conn = get_snowflake_connection()
-    if not conn:
-        return None
-    
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _cached_llm_sql(prompt_hash, natural_query):
+    """Generate SQL via OpenAI, cached on the prompt hash (raises on API failure)"""
+    sql_query = _complete_sql("gpt-4o-mini", natural_query, SYSTEM_PROMPT)
+
+    # Fall back to gpt-4 only when the small model's output isn't usable SQL
+    if "SELECT" not in sql_query.upper():
+        sql_query = _complete_sql("gpt-4", natural_query, SYSTEM_PROMPT)
+
+    return sql_query
+
+# Matches a fully fenced response (```sql … ``` in any case, with optional
+# surrounding whitespace) and captures the SQL body in one pass
+_FENCE_RE = re.compile(r"\A\s*```(?:sql)?\s*\n?(.*?)\n?\s*```\s*\Z", re.IGNORECASE | re.DOTALL)
+
+def _complete_sql(model, natural_query, system_prompt):
+    """Run one completion, resolving schema tool calls, and strip markdown fences"""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": natural_query}
+    ]
+
+    # Let the model look up columns on demand instead of paying ~2.5k
+    # schema tokens on every call; cap the loop so a confused model
+    # can't ping-pong forever
+    for _ in range(4):
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=_SQL_TOOLS,
+            max_tokens=600,
+            temperature=0.1
+        )
+        message = response.choices[0].message
+        if not message.tool_calls:
+            break
+
+        messages.append(message)
+        for tool_call in message.tool_calls:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+            columns = get_table_columns(arguments.get("table_name", ""))
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": json.dumps(columns)
+            })
+
+    sql_query = (message.content or "").strip()
+
+    # Clean up the response to extract just the SQL
+    match = _FENCE_RE.match(sql_query)
+    if match:
+        sql_query = match.group(1)
+
+    return sql_query.strip()
+
+_SQL_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_SQL_WS_RE = re.compile(r"\s+")
+
+def _canonicalize_sql(sql):
+    """Normalize SQL text into a cache key for equivalent queries.
+
+    Strips comments, collapses whitespace, and trims trailing semicolons so
+    re-generated versions of the same query hit the local cache. Used only
+    as the cache key — the regexes are not quote-aware, so the normalized
+    text must never be executed (a literal containing '--' would truncate).
+    """
+    sql = _SQL_COMMENT_RE.sub(" ", sql)
+    return _SQL_WS_RE.sub(" ", sql).strip().rstrip(";").strip()
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def _run_sql(canonical_sql, _sql_query):
+    """Fetch a query result via the connection pool (raises on failure).
+
+    Keyed on the canonicalized SQL text only (the raw query is excluded from
+    hashing), so re-executing an equivalent query within the TTL is a cache
+    lookup instead of a Snowflake round trip; what executes is the original,
+    untouched SQL.
+    """
+    from snowflake.connector.errors import NotSupportedError
+
+    pool = _get_sf_pool()
+    conn = pool.get()
     try:
         cursor = conn.cursor()
-        cursor.execute(sql_query)
-        
-        # Fetch results
-        results = cursor.fetchall()
-        column_names = [desc[0] for desc in cursor.description]
-        
-        # Create DataFrame
-        df = pd.DataFrame(results, columns=column_names)
-        
-        # Fix data type issues for Streamlit display
-        df = fix_dataframe_for_streamlit(df)
-        
+        cursor.execute(_sql_query)
+
+        try:
+            # Arrow path: stream result batches straight into DataFrames
+            # without boxing every value as a Python object, stopping at
+            # the row cap so huge results can't exhaust memory
+            batches = []
+            fetched = 0
+            for batch in cursor.fetch_pandas_batches():
+                batches.append(batch)
+                fetched += len(batch)
+                if fetched >= _MAX_RESULT_ROWS:
+                    st.warning(f"⚠️ Result truncated to the first {_MAX_RESULT_ROWS:,} rows")
+                    break
+            if batches:
+                df = pd.concat(batches, ignore_index=True).head(_MAX_RESULT_ROWS)
+            else:
+                df = cursor.fetch_pandas_all()
+        except NotSupportedError:
+            # Fall back to row fetching for non-Arrow results
+            results = cursor.fetchmany(_MAX_RESULT_ROWS)
+            column_names = [desc[0] for desc in cursor.description]
+            df = pd.DataFrame(results, columns=column_names)
+
         cursor.close()
-        conn.close()
-        
-        return df
-    
+
+        # Fix data type issues for Streamlit display
+        return fix_dataframe_for_streamlit(df)
+
+    finally:
+        # Return the connection to the pool instead of closing it
+        pool.put(conn)
+
+def execute_sql_query(sql_query):
+    """Execute SQL query and return results"""
+    try:
+        return _run_sql(_canonicalize_sql(sql_query), sql_query)
     except Exception as e:
         st.error(f"Error executing SQL: {str(e)}")
-        if conn:
-            conn.close()
         return None
 
 def fix_dataframe_for_streamlit(df):
     """Fix dataframe data types to be compatible with Streamlit and PyArrow"""
-    
-    # Convert problematic data types
-    for col in df.columns:
-        # Handle object/string columns that might cause PyArrow issues
-        if df[col].dtype == 'object':
-            # Convert to string, handling None/NaN values
-            df[col] = df[col].astype(str).replace('nan', '').replace('None', '')
-        
-        # Handle datetime columns
-        elif 'datetime' in str(df[col].dtype):
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-        # Handle numeric columns with mixed types
-        elif df[col].dtype == 'object':
-            try:
-                # Try to convert to numeric
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            except:
-                # If conversion fails, keep as string
-                df[col] = df[col].astype(str).replace('nan', '').replace('None', '')
-    
+
+    # Arrow-backed dtypes sidestep the object-column problem entirely and
+    # hold strings in far less memory than object arrays
+    df = df.convert_dtypes(dtype_backend="pyarrow")
+
+    # Partition columns once and fix any object-typed leftovers in a single
+    # bulk masked cast rather than a per-column Python loop
+    obj_cols = df.select_dtypes(include="object").columns
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), "").astype("string[pyarrow]")
+
     return df
 
+# Precompiled once — word boundaries avoid false positives on identifiers
+# like CREATED_AT, and IGNORECASE skips the .upper() copy of the query
+_DANGEROUS_RE = re.compile(r"\b(DROP|DELETE|TRUNCATE|ALTER|CREATE|GRANT|REVOKE)\b", re.IGNORECASE)
+_HAS_SELECT_RE = re.compile(r"\bSELECT\b", re.IGNORECASE)
+
 def validate_sql_query(sql_query):
     """Basic SQL validation"""
     # Check for dangerous keywords
-    dangerous_keywords = ['DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE', 'GRANT', 'REVOKE']
-    sql_upper = sql_query.upper()
-    
-    for keyword in dangerous_keywords:
-        if keyword in sql_upper:
-            return False, f"Query contains potentially dangerous keyword: {keyword}"
-    
+    match = _DANGEROUS_RE.search(sql_query)
+    if match:
+        return False, f"Query contains potentially dangerous keyword: {match.group(1).upper()}"
+
     # Check for SELECT statement
-    if 'SELECT' not in sql_upper:
+    if not _HAS_SELECT_RE.search(sql_query):
         return False, "Query must contain a SELECT statement"
-    
+
     return True, "Query appears safe"
 
 def show_general_query_interface():
@@ -311,100 +476,165 @@ def show_general_query_interface():
                 st.error(validation_message)
                 st.warning("Please review and fix the SQL query before execution")
 
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df):
+    """Serialize a DataFrame to CSV bytes once per result set"""
+    import io
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    # PyArrow's C++ writer streams straight into the buffer — much faster
+    # and lighter than materializing one giant Python string via to_csv
+    buf = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False)
+def _to_xlsx_bytes(df):
+    """Serialize a DataFrame to an Excel workbook once per result set"""
+    import io
+
+    excel_buffer = io.BytesIO()
+    cleaned_df = clean_data_for_excel(df)
+    # strings_to_urls skips a pathological per-cell regex on free-text columns.
+    # No constant_memory: it flushes rows as the writer passes them, but pandas
+    # emits cells column-by-column, so later columns would be dropped
+    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter',
+                        engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
+        cleaned_df.to_excel(writer, index=False, sheet_name='Query Results')
+    return excel_buffer.getvalue()
+
+@st.fragment
+def _render_downloads(results_df):
+    """Download buttons — a fragment so clicks rerun only this block"""
+    col_dl1, col_dl2 = st.columns(2)
+    with col_dl1:
+        try:
+            st.download_button(
+                label="📥 Download CSV",
+                data=_to_csv_bytes(results_df),
+                file_name="query_results.csv",
+                mime="text/csv"
+            )
+        except Exception as e:
+            st.error(f"❌ CSV download failed: {str(e)}")
+            st.info("💡 The data may contain unsupported characters.")
+
+    with col_dl2:
+        try:
+            st.download_button(
+                label="📥 Download Excel",
+                data=_to_xlsx_bytes(results_df),
+                file_name="query_results.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+        except Exception as e:
+            st.error(f"❌ Excel export failed: {str(e)}")
+            st.info("💡 Try downloading as CSV instead, or the data may contain unsupported characters.")
+            # Fallback to CSV
+            st.download_button(
+                label="📥 Download CSV (Fallback)",
+                data=_to_csv_bytes(results_df),
+                file_name="query_results.csv",
+                mime="text/csv"
+            )
+
+@st.cache_data(show_spinner=False)
+def _analysis_pack(df):
+    """Precompute the derived views the results panel renders on every rerun"""
+    import pyarrow as pa
+
+    # Arrow column metadata carries null counts and byte sizes, so both
+    # stats are O(columns) reads instead of full Python-level scans
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    missing_data = pd.Series(
+        {name: tbl.column(name).null_count for name in tbl.column_names},
+        name='Missing Count'
+    ).to_frame()
+    missing_data['Missing Percentage'] = (missing_data['Missing Count'] / len(df)) * 100
+    return {
+        'rows': len(df),
+        'cols': len(df.columns),
+        'mem_kb': tbl.nbytes / 1024,
+        'head10': df.head(10),
+        'dtypes': df.dtypes.astype(str).to_frame('Data Type'),
+        'missing': missing_data,
+    }
+
 def show_results_analysis():
     """Show the results analysis section"""
-    
+
     if 'query_results' in st.session_state and st.session_state.query_results is not None:
         st.markdown("---")
         st.subheader("📊 Query Results")
-        
+
         results_df = st.session_state.query_results
-        
+        pack = _analysis_pack(results_df)
+
         # Display results info
         col_info1, col_info2, col_info3 = st.columns(3)
         with col_info1:
-            st.metric("Total Rows", len(results_df))
+            st.metric("Total Rows", pack['rows'])
         with col_info2:
-            st.metric("Total Columns", len(results_df.columns))
+            st.metric("Total Columns", pack['cols'])
         with col_info3:
-            st.metric("Memory Usage", f"{results_df.memory_usage(deep=True).sum() / 1024:.1f} KB")
+            st.metric("Memory Usage", f"{pack['mem_kb']:.1f} KB")
         
         # Display the dataframe
         st.dataframe(results_df, use_container_width=True)
         
         # Download options
-        col_dl1, col_dl2 = st.columns(2)
-        with col_dl1:
-            try:
-                csv = results_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv,
-                    file_name="query_results.csv",
-                    mime="text/csv"
-                )
-            except Exception as e:
-                st.error(f"❌ CSV download failed: {str(e)}")
-                st.info("💡 The data may contain unsupported characters.")
-        
-        with col_dl2:
-            excel_buffer = io.BytesIO()
-            try:
-                # Clean data for Excel export
-                cleaned_df = clean_data_for_excel(results_df)
-                with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                    cleaned_df.to_excel(writer, index=False, sheet_name='Query Results')
-                excel_data = excel_buffer.getvalue()
-                st.download_button(
-                    label="📥 Download Excel",
-                    data=excel_data,
-                    file_name="query_results.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            except Exception as e:
-                st.error(f"❌ Excel export failed: {str(e)}")
-                st.info("💡 Try downloading as CSV instead, or the data may contain unsupported characters.")
-                # Fallback to CSV
-                csv_data = results_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download CSV (Fallback)",
-                    data=csv_data,
-                    file_name="query_results.csv",
-                    mime="text/csv"
-                )
+        _render_downloads(results_df)
         
         # Show sample data analysis
         st.subheader("Data Preview")
         tab1, tab2, tab3 = st.tabs(["First 10 Rows", "Data Types", "Missing Values"])
         
         with tab1:
-            st.dataframe(results_df.head(10), use_container_width=True)
-        
+            st.dataframe(pack['head10'], use_container_width=True)
+
         with tab2:
-            st.dataframe(results_df.dtypes.to_frame('Data Type'), use_container_width=True)
-        
+            st.dataframe(pack['dtypes'], use_container_width=True)
+
         with tab3:
-            missing_data = results_df.isnull().sum().to_frame('Missing Count')
-            missing_data['Missing Percentage'] = (missing_data['Missing Count'] / len(results_df)) * 100
-            st.dataframe(missing_data, use_container_width=True)
+            st.dataframe(pack['missing'], use_container_width=True)
+
+# Built once: maps the characters that break Excel export in a single pass
+_EXCEL_TRANSLATE_TABLE = str.maketrans({'~': '-', '`': "'", '|': '-'})
 
 def clean_data_for_excel(df):
     """Clean dataframe data to make it Excel-compatible"""
+    if df.empty:
+        return df
+
     cleaned_df = df.copy()
-    
-    for col in cleaned_df.columns:
-        if cleaned_df[col].dtype == 'object':
+
+    for col in cleaned_df.select_dtypes(include=['object', 'string']).columns:
+        s = cleaned_df[col].astype('string')
+        # Most columns contain no illegal characters — skip the rewrite entirely
+        if s.str.contains(r'[~`|]', regex=True, na=False).any():
             # Replace illegal characters that cause Excel export errors
-            cleaned_df[col] = cleaned_df[col].astype(str).apply(
-                lambda x: x.replace('~', '-').replace('`', "'").replace('|', '-') if pd.notna(x) else x
-            )
-            # Truncate very long strings to avoid Excel cell limits
-            cleaned_df[col] = cleaned_df[col].apply(
-                lambda x: x[:32000] + '...' if pd.notna(x) and len(str(x)) > 32000 else x
-            )
-    
+            s = s.str.translate(_EXCEL_TRANSLATE_TABLE)
+        # Truncate very long strings to avoid Excel cell limits
+        too_long = s.str.len() > 32000
+        if too_long.any():
+            s = s.where(~too_long, s.str.slice(0, 32000) + '...')
+        cleaned_df[col] = s
+
     return cleaned_df
 
+def _get_np_search():
+    """Construct the NP search once per session and reuse it across reruns.
+
+    Kept in session_state rather than cache_resource: the instance is mutable
+    (the advanced-search UI rewrites its keyword lists), so a process-global
+    copy would leak one user's custom lists into every other session.
+    """
+    if 'np_search' not in st.session_state:
+        from nurse_practitioner_search import NursePractitionerSearch
+        st.session_state.np_search = NursePractitionerSearch()
+    return st.session_state.np_search
+
 def main():
     st.title("❄️ GradToHired Database Automation")
     st.markdown("Convert natural language to SQL and find specialized healthcare professionals")
@@ -460,7 +690,7 @@ def main():
         
         # Initialize the nurse practitioner search
         try:
-            np_search = NursePractitionerSearch()
+            np_search = _get_np_search()
             st.success("✅ Nurse Practitioner Search module initialized successfully!")
             
             # Show the advanced search UI
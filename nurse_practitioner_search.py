@@ -8,11 +8,65 @@ with specific licensing requirements and telehealth experience.
 import streamlit as st
 import pandas as pd
 import snowflake.connector
+import json
 import os
+import re
 from dotenv import load_dotenv
 
+try:
+    import hyperscan
+except ImportError:
+    # Optional accelerator; _match_any falls back to compiled re
+    hyperscan = None
+
 load_dotenv()
 
+def _minimize(keywords):
+    """Lowercase, dedupe, and drop keywords subsumed by a shorter one.
+
+    Any text containing 'telehealth platform' also contains 'telehealth', so
+    the longer pattern only widens the alternation without adding matches.
+    """
+    lowered = list(dict.fromkeys(k.lower().strip() for k in keywords if k.strip()))
+    return [k for k in lowered
+            if not any(other != k and other in k for other in lowered)]
+
+@st.cache_resource(show_spinner=False)
+def get_conn(config_items):
+    """One authenticated Snowflake connection per config, shared across reruns.
+
+    Keep-alive and the query tag are set at connect time so searches skip the
+    TLS/auth handshake and any per-query ALTER SESSION round trips.
+    """
+    return snowflake.connector.connect(
+        paramstyle='numeric',
+        client_session_keep_alive=True,
+        session_parameters={'QUERY_TAG': 'np_search'},
+        **dict(config_items)
+    )
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _run_np_search(sql_query, params, config_items):
+    """Execute one search, cached so identical repeat searches skip Snowflake.
+
+    Keyed on the SQL text and bound parameters; raises on failure so errors
+    are never cached (the calling wrapper reports them).
+    """
+    conn = get_conn(config_items)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql_query, list(params))
+        try:
+            # Arrow columnar transport: no per-cell Python object boxing
+            return cursor.fetch_pandas_all()
+        except snowflake.connector.errors.NotSupportedError:
+            # Non-Arrow result (e.g. older connector) — fall back to rows
+            results = cursor.fetchall()
+            column_names = [desc[0] for desc in cursor.description]
+            return pd.DataFrame(results, columns=column_names)
+    finally:
+        cursor.close()
+
 class NursePractitionerSearch:
     """Specialized class for nurse practitioner searches"""
     
@@ -50,18 +104,27 @@ class NursePractitionerSearch:
             st.info("💡 **Local Development**: Add to .env file | **Streamlit Cloud**: Add to Settings → Secrets")
             st.stop()
         
-        # Common nurse practitioner job titles and variations
-        self.nurse_titles = [
-            'nurse practitioner', 'np', 'nurse', 'rn', 'registered nurse',
-            'advanced practice nurse', 'apn', 'family nurse practitioner',
-            'fnp', 'adult nurse practitioner', 'anp', 'pediatric nurse practitioner',
-            'pnp', 'psychiatric nurse practitioner', 'pmhnp', 'clinical nurse specialist',
-            'cns', 'nurse anesthetist', 'crna', 'nurse midwife', 'cnm',
-            'acute care nurse practitioner', 'acnp', 'geriatric nurse practitioner', 'gnp'
+        # Common nurse practitioner job titles and variations.
+        # Substring terms are kept at 5+ characters so the Search Optimization
+        # Service can serve them (see sql/contact_search_dz_search_optimization.sql);
+        # short abbreviations match whole titles exactly instead — as substrings
+        # they mostly hit noise ('%rn%' matches 'internal').
+        self.nurse_titles = _minimize([
+            'nurse practitioner', 'nurse', 'registered nurse',
+            'advanced practice nurse', 'family nurse practitioner',
+            'adult nurse practitioner', 'pediatric nurse practitioner',
+            'psychiatric nurse practitioner', 'pmhnp', 'clinical nurse specialist',
+            'nurse anesthetist', 'nurse midwife',
+            'acute care nurse practitioner', 'geriatric nurse practitioner'
+        ])
+        self.nurse_title_abbreviations = [
+            'np', 'rn', 'apn', 'fnp', 'anp', 'pnp', 'cns', 'crna', 'cnm',
+            'acnp', 'gnp'
         ]
         
-        # Enhanced telehealth-related keywords with variations
-        self.telehealth_keywords = [
+        # Enhanced telehealth-related keywords with variations; _minimize
+        # strips the entries subsumed by a shorter keyword at init time
+        self.telehealth_keywords = _minimize([
             'telehealth', 'telemedicine', 'remote', 'virtual', 'online',
             'telepractice', 'ehealth', 'digital health', 'remote care',
             'virtual care', 'teleconsultation', 'telemonitoring',
@@ -70,7 +133,7 @@ class NursePractitionerSearch:
             'digital consultations', 'remote healthcare', 'virtual healthcare',
             'telehealth platform', 'telemedicine platform', 'remote clinical',
             'virtual clinical', 'online clinical', 'digital clinical'
-        ]
+        ])
         
         # State abbreviations for licensing
         self.state_abbreviations = {
@@ -90,11 +153,13 @@ class NursePractitionerSearch:
             'virginia': 'VA', 'washington': 'WA', 'west virginia': 'WV',
             'wisconsin': 'WI', 'wyoming': 'WY'
         }
+        # Set membership beats scanning .values() for every user-supplied state
+        self._valid_codes = frozenset(self.state_abbreviations.values())
     
     def get_connection(self):
-        """Get Snowflake connection"""
+        """Get the shared Snowflake connection"""
         try:
-            return snowflake.connector.connect(**self.snowflake_config)
+            return get_conn(tuple(sorted(self.snowflake_config.items())))
         except Exception as e:
             st.error(f"Connection failed: {str(e)}")
             return None
@@ -116,27 +181,100 @@ class NursePractitionerSearch:
         state_codes = []
         for state in states:
             state_lower = state.lower().strip()
-            if state_lower in self.state_abbreviations:
-                state_codes.append(self.state_abbreviations[state_lower])
-            elif state_lower.upper() in self.state_abbreviations.values():
-                state_codes.append(state_lower.upper())
+            code = self.state_abbreviations.get(state_lower, state_lower.upper())
+            if code in self._valid_codes:
+                state_codes.append(code)
         
         if not state_codes:
             st.error("No valid states provided")
             return None
         
         # Build the SQL query
-        sql_query = self._build_np_search_query(state_codes, min_states, require_telehealth)
-        
+        sql_query, params = self._build_np_search_query(state_codes, min_states, require_telehealth)
+
         # Execute the query
-        return self._execute_query(sql_query)
+        return self._execute_query(sql_query, params)
     
     def _build_np_search_query(self, state_codes, min_states, require_telehealth):
-        """Build the SQL query for nurse practitioner search"""
+        """Build the SQL query for nurse practitioner search
+
+        The query deliberately has no GROUP BY: the per-person state count
+        comes from window functions over RBID, so payload columns are never
+        hashed as grouping keys.
+        """
         
-        # Create clean keyword lists for SQL
-        telehealth_patterns = [f"'%{keyword}%'" for keyword in self.telehealth_keywords]
-        nurse_patterns = [f"'%{title}%'" for title in self.nurse_titles]
+        # Collapse each keyword list into a single alternation so Snowflake's
+        # RE2 engine scans each column once instead of once per keyword.
+        # Snowflake regexes match the whole subject, hence the '.*' bracketing.
+        def _alternation(keywords):
+            alt = '|'.join(re.escape(keyword) for keyword in keywords)
+            return f".*({alt}).*"
+
+        telehealth_regex = _alternation(self.telehealth_keywords)
+        nurse_regex = _alternation(self.nurse_titles)
+        abbrev_list = ', '.join(f"'{abbrev}'" for abbrev in self.nurse_title_abbreviations)
+
+        # Role names that lead the title string when present ("Registered Nurse -
+        # ICU") are anchored as prefixes so Snowflake can prune them like a range
+        # scan on the generated JOB_TITLE_LC column (see
+        # sql/contact_search_dz_lowercase_columns.sql); the rest stay as substring
+        # patterns, and mid-string role names are still caught by the
+        # JOB_FUNCTION / JOB_DESCRIPTION substring checks.
+        prefix_titles = [t for t in self.nurse_titles
+                         if t.startswith('nurse') or t == 'registered nurse']
+        # Titles are user-editable, so escape quotes before interpolating
+        title_prefix_patterns = ["'{}%'".format(title.replace("'", "''"))
+                                 for title in prefix_titles]
+        # The minimized list's shortest role names subsume their prefix
+        # variants, so the infix regex covers every title; the anchored
+        # branch above it is purely a pruning fast path
+        title_infix_regex = _alternation(self.nurse_titles)
+
+        # Custom title lists may have no anchorable entries, in which case the
+        # LIKE ANY fast path is omitted entirely (LIKE ANY () is a SQL error)
+        nurse_clauses = []
+        if title_prefix_patterns:
+            nurse_clauses.append(
+                f"COALESCE(c.JOB_TITLE_LC, '') LIKE ANY ({', '.join(title_prefix_patterns)})")
+        nurse_clauses += [
+            "REGEXP_LIKE(COALESCE(c.JOB_TITLE_LC, ''), :3)",
+            f"TRIM(COALESCE(c.JOB_TITLE_LC, '')) IN ({abbrev_list})",
+            "REGEXP_LIKE(COALESCE(c.JOB_FUNCTION, ''), :2, 'i')",
+            "REGEXP_LIKE(COALESCE(c.JOB_DESCRIPTION, ''), :2, 'i')",
+        ]
+        nurse_detection = '\n                    OR '.join(nurse_clauses)
+
+        # Optional full-text pre-filter: SEARCH() probes the token index
+        # (sql/contact_search_dz_fulltext.sql), so it cheaply discards rows with
+        # no nurse-related token before the precise regex predicates run. Token
+        # matching is whole-word and can miss inflected forms ('nurses'), so
+        # this is opt-in via NP_USE_FULLTEXT.
+        search_prefilter = ""
+        if os.getenv('NP_USE_FULLTEXT'):
+            tokens = sorted({word for title in self.nurse_titles for word in title.split()}
+                            | set(self.nurse_title_abbreviations))
+            # SEARCH() already ORs its tokens; space-separate them (an 'OR'
+            # joiner would itself be searched for as a token)
+            search_terms = ' '.join(tokens).replace("'", "''")
+            search_prefilter = (
+                "AND SEARCH((c.JOB_TITLE, c.JOB_FUNCTION, c.JOB_DESCRIPTION), "
+                f"'{search_terms}')"
+            )
+
+        # The CTE WHERE already guarantees every surviving row is a nurse
+        # practitioner, so the flags are late-materialized: the telehealth
+        # check moves into the CTE WHERE when it's a hard requirement,
+        # otherwise it's computed as a flag over the already-filtered rows.
+        def _telehealth_check(prefix):
+            checks = f"""
+                    OR """.join(
+                f"REGEXP_LIKE(COALESCE({prefix}{col}, ''), :1, 'i')"
+                for col in ('JOB_DESCRIPTION', 'LINKEDIN_HEADLINE', 'SKILLS',
+                            'EDUCATION', 'JOB_FUNCTION'))
+            return f"({checks})"
+
+        telehealth_filter = f"AND {_telehealth_check('c.')}" if require_telehealth else ""
+        telehealth_flag = "TRUE" if require_telehealth else _telehealth_check('')
         
         # Base query focusing on contact_search_dz table with creative telehealth detection
         base_query = f"""
@@ -156,69 +294,47 @@ class NursePractitionerSearch:
                 c.EDUCATION,
                 c.LINKEDIN_URL,
                 c.JOB_FUNCTION,
-                c.JOB_LEVEL,
                 c.JOB_START_DATE,
                 c.JOB_END_DATE,
                 c.JOB_IS_CURRENT,
-                c.JOB_ORG_LINKEDIN_URL,
-                c.JOB_ORDER_IN_PROFILE,
-                c.JOB_LOCATION_COUNTRY,
-                c.JOB_LOCATION_COUNTRY_CODE,
-                c.JOB_LOCATION_COUNTRY_REGION,
-                c.JOB_LOCATION_CONTINENT,
-                c.COUNTRY_NAME,
-                c.STATE_NAME,
-                c.JOB_COUNT,
-                c.COMPANY_URL,
-                c.RBID_ORG,
                 c.RBID,
-                c.COMPANY_PREFIX,
-                c.JOBTITLE_PREFIX,
-                -- Count distinct states where they have job locations
-                COUNT(DISTINCT c.JOB_LOCATION_STATE_CODE) as states_licensed_in,
-                -- Enhanced telehealth experience detection across multiple fields
-                CASE 
-                    WHEN (
-                        LOWER(COALESCE(c.JOB_DESCRIPTION, '')) LIKE ANY ({', '.join(telehealth_patterns)})
-                        OR LOWER(COALESCE(c.LINKEDIN_HEADLINE, '')) LIKE ANY ({', '.join(telehealth_patterns)})
-                        OR LOWER(COALESCE(c.SKILLS, '')) LIKE ANY ({', '.join(telehealth_patterns)})
-                        OR LOWER(COALESCE(c.EDUCATION, '')) LIKE ANY ({', '.join(telehealth_patterns)})
-                        OR LOWER(COALESCE(c.JOB_FUNCTION, '')) LIKE ANY ({', '.join(telehealth_patterns)})
-                    ) THEN TRUE 
-                    ELSE FALSE 
-                END as has_telehealth_experience,
-                -- Enhanced nurse title detection
-                CASE 
-                    WHEN LOWER(COALESCE(c.JOB_TITLE, '')) LIKE ANY ({', '.join(nurse_patterns)})
-                    OR LOWER(COALESCE(c.JOB_FUNCTION, '')) LIKE ANY ({', '.join(nurse_patterns)})
-                    THEN TRUE 
-                    ELSE FALSE 
-                END as is_nurse_practitioner
+                -- Ranks states per person; MAX(state_rank) below is the distinct
+                -- state count (Snowflake has no COUNT(DISTINCT ...) OVER)
+                DENSE_RANK() OVER (
+                    PARTITION BY c.RBID ORDER BY c.JOB_LOCATION_STATE_CODE
+                ) as state_rank
             FROM userprofiles.public.contact_search_dz c
-            WHERE 
+            WHERE
+                -- Literal predicates first: with the clustering key on
+                -- (JOB_IS_CURRENT, JOB_LOCATION_STATE_CODE) these prune whole
+                -- micropartitions before any text predicate runs
+                COALESCE(c.JOB_IS_CURRENT, FALSE) = TRUE
+                -- IN over the flattened bound array keeps the clustered column
+                -- bare (no cast/function wrapper), so pruning still applies
+                AND c.JOB_LOCATION_STATE_CODE IN (
+                    SELECT VALUE::STRING FROM TABLE(FLATTEN(INPUT => PARSE_JSON(:4)))
+                )
                 -- Enhanced nurse practitioner detection
-                (
-                    LOWER(COALESCE(c.JOB_TITLE, '')) LIKE ANY ({', '.join(nurse_patterns)})
-                    OR LOWER(COALESCE(c.JOB_FUNCTION, '')) LIKE ANY ({', '.join(nurse_patterns)})
-                    OR LOWER(COALESCE(c.JOB_DESCRIPTION, '')) LIKE ANY ({', '.join(nurse_patterns)})
+                AND (
+                    {nurse_detection}
                 )
-                -- Check if they have locations in any of the specified states
-                AND c.JOB_LOCATION_STATE_CODE IN ({', '.join([f"'{code}'" for code in state_codes])})
-                -- Only include current jobs
-                AND COALESCE(c.JOB_IS_CURRENT, FALSE) = TRUE
-            GROUP BY 
-                c.FIRST_NAME, c.LAST_NAME, c.EMAIL_ADDRESS, c.JOB_TITLE, 
-                c.JOB_DESCRIPTION, c.LINKEDIN_HEADLINE, c.JOB_LOCATION_STATE_CODE,
-                c.JOB_LOCATION_CITY, c.JOB_LOCATION_STATE, c.JOB_LOCATION_COUNTRY,
-                c.COMPANY_NAME, c.SKILLS, c.EDUCATION, c.LINKEDIN_URL,
-                c.JOB_FUNCTION, c.JOB_LEVEL, c.JOB_START_DATE, c.JOB_END_DATE,
-                c.JOB_IS_CURRENT, c.JOB_ORG_LINKEDIN_URL, c.JOB_ORDER_IN_PROFILE,
-                c.JOB_LOCATION_STATE_CODE, c.JOB_LOCATION_COUNTRY_CODE,
-                c.JOB_LOCATION_COUNTRY_REGION, c.JOB_LOCATION_CONTINENT,
-                c.COUNTRY_NAME, c.STATE_NAME, c.JOB_COUNT, c.COMPANY_URL,
-                c.RBID_ORG, c.RBID, c.COMPANY_PREFIX, c.JOBTITLE_PREFIX
+                {telehealth_filter}
+                {search_prefilter}
+        ),
+        licensed AS (
+            SELECT
+                nc.*,
+                MAX(nc.state_rank) OVER (PARTITION BY nc.RBID) as states_licensed_in
+            FROM nurse_candidates nc
+            -- QUALIFY runs after the window above, so the state count sees all
+            -- of a person's rows before dedup keeps their most recent one
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY nc.RBID
+                ORDER BY COALESCE(nc.JOB_IS_CURRENT, FALSE) DESC,
+                         nc.JOB_START_DATE DESC NULLS LAST
+            ) = 1
         )
-        SELECT 
+        SELECT
             FIRST_NAME,
             LAST_NAME,
             EMAIL_ADDRESS,
@@ -233,48 +349,66 @@ class NursePractitionerSearch:
             EDUCATION,
             LINKEDIN_URL,
             states_licensed_in,
-            has_telehealth_experience,
-            is_nurse_practitioner,
+            {telehealth_flag} as has_telehealth_experience,
+            TRUE as is_nurse_practitioner,
             JOB_START_DATE,
             JOB_END_DATE,
             JOB_IS_CURRENT
-        FROM nurse_candidates
-        WHERE 
-            states_licensed_in >= {min_states}
-            AND is_nurse_practitioner = TRUE
-            {f"AND has_telehealth_experience = TRUE" if require_telehealth else ""}
-        ORDER BY 
+        FROM licensed
+        WHERE
+            states_licensed_in >= :5
+        ORDER BY
             states_licensed_in DESC,
             has_telehealth_experience DESC,
             JOB_START_DATE DESC
         """
-        
-        return base_query
+
+        # Bound values keep the SQL text identical across invocations, so both
+        # Snowflake's plan cache and result cache can serve repeat searches.
+        # Only the keyword lists (stable per configuration) stay interpolated.
+        params = [telehealth_regex, nurse_regex, title_infix_regex,
+                  json.dumps(sorted(state_codes)), min_states]
+
+        return base_query, params
     
-    def _execute_query(self, sql_query):
+    def _match_any(self, series, keywords):
+        """Boolean mask of rows whose text contains any keyword (case-insensitive).
+
+        Uses Hyperscan's multi-pattern DFA when the optional dependency is
+        installed — one pass per string regardless of keyword count — and
+        falls back to a single compiled re alternation otherwise.
+        """
+        text = series.fillna('').astype(str)
+
+        if hyperscan is not None:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[re.escape(keyword).encode() for keyword in keywords],
+                flags=[hyperscan.HS_FLAG_CASELESS] * len(keywords),
+            )
+
+            def _hit(value):
+                found = []
+                db.scan(value.encode(),
+                        match_event_handler=lambda *args: found.append(1))
+                return bool(found)
+
+            return text.map(_hit)
+
+        pattern = re.compile('|'.join(re.escape(keyword) for keyword in keywords),
+                             re.IGNORECASE)
+        return text.map(lambda value: pattern.search(value) is not None)
+
+    def _execute_query(self, sql_query, params=None):
         """Execute SQL query and return results"""
-        conn = self.get_connection()
-        if not conn:
-            return None
-        
         try:
-            cursor = conn.cursor()
-            cursor.execute(sql_query)
-            
-            results = cursor.fetchall()
-            column_names = [desc[0] for desc in cursor.description]
-            
-            df = pd.DataFrame(results, columns=column_names)
-            
-            cursor.close()
-            conn.close()
-            
-            return df
-        
+            # Tuples make the arguments hashable for the cache key
+            return _run_np_search(sql_query, tuple(params or ()),
+                                  tuple(sorted(self.snowflake_config.items())))
         except Exception as e:
             st.error(f"Query execution failed: {str(e)}")
-            if conn:
-                conn.close()
+            # The cached connection may have gone stale; rebuild it next time
+            get_conn.clear()
             return None
     
     def get_advanced_search_ui(self):
@@ -299,7 +433,7 @@ class NursePractitionerSearch:
                 if custom_nurse_titles.strip():
                     custom_titles = [title.strip() for title in custom_nurse_titles.split('\n') if title.strip()]
                     if custom_titles:
-                        self.nurse_titles = custom_titles
+                        self.nurse_titles = _minimize(custom_titles)
             
             with col2:
                 st.write("**Telehealth Keywords:**")
@@ -314,7 +448,7 @@ class NursePractitionerSearch:
                 if custom_telehealth.strip():
                     custom_keywords = [keyword.strip() for keyword in custom_telehealth.split('\n') if keyword.strip()]
                     if custom_keywords:
-                        self.telehealth_keywords = custom_keywords
+                        self.telehealth_keywords = _minimize(custom_keywords)
         
         # State selection
         col1, col2 = st.columns(2)
@@ -386,16 +520,34 @@ class NursePractitionerSearch:
         if results_df is None or results_df.empty:
             return
         
-        # Debug: Show what columns we actually have
-        st.write("**Debug - Available columns:**")
-        st.write(list(results_df.columns))
-        
-        # Debug: Show first few rows to understand the data structure
-        st.write("**Debug - First few rows:**")
-        st.write(results_df.head(3))
+        # Debug output is opt-in: rendering it serializes the frame preview on
+        # every result display
+        if os.getenv('NP_DEBUG'):
+            st.write("**Debug - Available columns:**")
+            st.write(list(results_df.columns))
+
+            st.write("**Debug - First few rows:**")
+            st.write(results_df.head(3))
         
         st.subheader("📊 Search Results Analysis")
-        
+
+        # Optional client-side refinement — no extra Snowflake round trip
+        refine = st.text_input(
+            "Refine results (comma-separated keywords):",
+            value="",
+            help="Keep candidates mentioning any keyword in their title, description, headline or skills"
+        )
+        if refine.strip():
+            keywords = [k.strip() for k in refine.split(',') if k.strip()]
+            mask = pd.Series(False, index=results_df.index)
+            for col in ('JOB_TITLE', 'JOB_DESCRIPTION', 'LINKEDIN_HEADLINE', 'SKILLS'):
+                if col in results_df.columns:
+                    mask |= self._match_any(results_df[col], keywords)
+            results_df = results_df[mask]
+            st.info(f"{len(results_df)} candidates after refinement")
+            if results_df.empty:
+                return
+
         # Key metrics with robust error handling
         col1, col2, col3, col4 = st.columns(4)
         
@@ -442,22 +594,43 @@ class NursePractitionerSearch:
         st.dataframe(results_df, use_container_width=True)
         
         # Download options
-        col_dl1, col_dl2 = st.columns(2)
-        
+        col_dl1, col_dl2, col_dl3 = st.columns(3)
+
         with col_dl1:
             try:
-                csv = results_df.to_csv(index=False)
+                import io
+                import pyarrow as pa
+                import pyarrow.csv as pacsv
+                # Arrow's C++ CSV writer — no whole-result Python string copy
+                csv_buf = io.BytesIO()
+                pacsv.write_csv(pa.Table.from_pandas(results_df, preserve_index=False),
+                                csv_buf)
                 st.download_button(
                     label="📥 Download CSV",
-                    data=csv,
+                    data=csv_buf.getvalue(),
                     file_name="nurse_practitioner_candidates.csv",
                     mime="text/csv"
                 )
             except Exception as e:
                 st.error(f"❌ CSV download failed: {str(e)}")
                 st.info("💡 The data may contain unsupported characters.")
-        
+
         with col_dl2:
+            try:
+                import io
+                # Columnar and compressed — far smaller for analyst hand-offs
+                pq_buf = io.BytesIO()
+                results_df.to_parquet(pq_buf, index=False, compression='zstd')
+                st.download_button(
+                    label="📦 Download Parquet",
+                    data=pq_buf.getvalue(),
+                    file_name="nurse_practitioner_candidates.parquet",
+                    mime="application/octet-stream"
+                )
+            except Exception as e:
+                st.error(f"❌ Parquet download failed: {str(e)}")
+
+        with col_dl3:
             # Create a summary report
             try:
                 summary = self._create_summary_report(results_df)
@@ -471,18 +644,21 @@ class NursePractitionerSearch:
                 st.error(f"❌ Summary report error: {str(e)}")
                 st.info("💡 Could not generate summary report due to data issues.")
         
-        # Detailed analysis tabs
+        # Detailed analysis tabs — aggregate once, render per tab
+        state_counts = results_df['JOB_LOCATION_STATE_CODE'].value_counts()
+        company_counts = results_df['COMPANY_NAME'].value_counts()
+
         tab1, tab2, tab3 = st.tabs(["State Distribution", "Company Analysis", "Skills Analysis"])
-        
+
         with tab1:
             try:
-                self._show_state_distribution(results_df)
+                self._show_state_distribution(results_df, state_counts)
             except Exception as e:
                 st.error(f"State distribution error: {str(e)}")
-        
+
         with tab2:
             try:
-                self._show_company_analysis(results_df)
+                self._show_company_analysis(results_df, company_counts)
             except Exception as e:
                 st.error(f"Company analysis error: {str(e)}")
         
@@ -541,11 +717,12 @@ This report was generated automatically by the Nurse Practitioner Search Tool.
         
         return report
     
-    def _show_state_distribution(self, results_df):
+    def _show_state_distribution(self, results_df, state_counts=None):
         """Show distribution of candidates across states"""
-        
-        state_counts = results_df['JOB_LOCATION_STATE_CODE'].value_counts()
-        
+
+        if state_counts is None:
+            state_counts = results_df['JOB_LOCATION_STATE_CODE'].value_counts()
+
         col1, col2 = st.columns(2)
         
         with col1:
@@ -559,11 +736,12 @@ This report was generated automatically by the Nurse Practitioner Search Tool.
             # Simple bar chart using streamlit
             st.bar_chart(state_counts.head(10))
     
-    def _show_company_analysis(self, results_df):
+    def _show_company_analysis(self, results_df, company_counts=None):
         """Show analysis of companies"""
-        
-        company_counts = results_df['COMPANY_NAME'].value_counts()
-        
+
+        if company_counts is None:
+            company_counts = results_df['COMPANY_NAME'].value_counts()
+
         col1, col2 = st.columns(2)
         
         with col1:
@@ -582,11 +760,15 @@ This report was generated automatically by the Nurse Practitioner Search Tool.
         # Skills analysis
         if 'SKILLS' in results_df.columns:
             st.write("**Skills Analysis:**")
-            skills_text = ' '.join(results_df['SKILLS'].dropna().astype(str))
-            if skills_text:
-                # Simple word frequency (basic approach)
-                words = skills_text.lower().split()
-                word_freq = pd.Series(words).value_counts().head(20)
+            # Bail out before any string conversion when there is nothing to count
+            skills = results_df['SKILLS'].dropna()
+            if skills.empty:
+                st.info("No skills data")
+            else:
+                # Tokenize with Arrow's C++ string kernels instead of joining
+                # everything into one giant Python string and splitting it
+                word_freq = (skills.astype('string[pyarrow]').str.lower()
+                             .str.split().explode().value_counts().head(20))
                 st.bar_chart(word_freq)
         
         # Education analysis
@@ -0,0 +1,6 @@
+-- One-time DDL: cluster the table on the two literal predicates every nurse
+-- search applies, so micropartition min/max pruning eliminates non-current
+-- jobs and out-of-state rows before any text predicate is evaluated.
+
+ALTER TABLE userprofiles.public.contact_search_dz
+    CLUSTER BY (JOB_IS_CURRENT, JOB_LOCATION_STATE_CODE);
@@ -0,0 +1,7 @@
+-- Optional one-time DDL: add full-text search optimization targets so the
+-- SEARCH() pre-filter in nurse_practitioner_search.py (enabled with
+-- NP_USE_FULLTEXT=1) probes a token index instead of scanning every row.
+-- Without this the pre-filter still works but falls back to a scan.
+
+ALTER TABLE userprofiles.public.contact_search_dz ADD SEARCH OPTIMIZATION ON
+    FULL_TEXT(JOB_TITLE, JOB_FUNCTION, JOB_DESCRIPTION);
@@ -0,0 +1,34 @@
+-- One-time DDL: materialize a lowercased copy of JOB_TITLE so the per-row
+-- LOWER() happens once at ingest instead of on every search, and so anchored
+-- prefix predicates (JOB_TITLE_LC LIKE 'nurse practitioner%') can be pruned
+-- against micropartition min/max metadata like a range scan.
+--
+-- Snowflake has no generated columns (ALTER TABLE ADD COLUMN only accepts
+-- constant/sequence defaults), so JOB_TITLE_LC is a real column: backfilled
+-- once here and kept current by a stream-gated task. Rows changed between
+-- task runs briefly carry a NULL JOB_TITLE_LC — the search COALESCEs the
+-- column and such rows are still caught by the JOB_FUNCTION and
+-- JOB_DESCRIPTION predicates.
+
+ALTER TABLE userprofiles.public.contact_search_dz
+    ADD COLUMN JOB_TITLE_LC STRING;
+
+UPDATE userprofiles.public.contact_search_dz
+   SET JOB_TITLE_LC = LOWER(JOB_TITLE);
+
+CREATE STREAM IF NOT EXISTS userprofiles.public.contact_search_dz_lc_stream
+    ON TABLE userprofiles.public.contact_search_dz;
+
+CREATE OR REPLACE TASK userprofiles.public.maintain_job_title_lc
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = '60 MINUTE'
+    WHEN SYSTEM$STREAM_HAS_DATA('userprofiles.public.contact_search_dz_lc_stream')
+AS
+UPDATE userprofiles.public.contact_search_dz t
+   SET JOB_TITLE_LC = LOWER(t.JOB_TITLE)
+  FROM (SELECT DISTINCT RBID
+          FROM userprofiles.public.contact_search_dz_lc_stream) s
+ WHERE t.RBID = s.RBID
+   AND NOT EQUAL_NULL(t.JOB_TITLE_LC, LOWER(t.JOB_TITLE));
+
+ALTER TASK userprofiles.public.maintain_job_title_lc RESUME;
@@ -0,0 +1,17 @@
+-- One-time DDL: enable the Search Optimization Service (SOS) on the columns
+-- the nurse practitioner search probes with substring predicates, plus the
+-- two equality filters it always applies. Run once as a role with OWNERSHIP
+-- on the table; Snowflake maintains the search access path automatically.
+--
+-- Note: SOS only serves substring predicates of 5+ characters, which is why
+-- nurse_practitioner_search.py keeps its substring keyword lists at that
+-- length and matches shorter abbreviations ('np', 'rn', ...) exactly.
+
+ALTER TABLE userprofiles.public.contact_search_dz ADD SEARCH OPTIMIZATION ON
+    SUBSTRING(JOB_TITLE),
+    SUBSTRING(JOB_FUNCTION),
+    SUBSTRING(JOB_DESCRIPTION),
+    SUBSTRING(LINKEDIN_HEADLINE),
+    SUBSTRING(SKILLS),
+    SUBSTRING(EDUCATION),
+    EQUALITY(JOB_LOCATION_STATE_CODE, JOB_IS_CURRENT);
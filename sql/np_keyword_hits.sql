@@ -0,0 +1,42 @@
+-- Optional precomputed inverted index over the default nurse/telehealth
+-- keyword dictionary. For repeat searches this turns the multi-predicate
+-- text scan into a join against a small hit table:
+--
+--     JOIN np_keyword_hits h ON h.RBID = c.RBID
+--     WHERE ARRAYS_OVERLAP(h.MATCHED_KEYWORDS, <bound keyword array>)
+--
+-- A materialized view cannot express the FLATTEN + CONTAINS join, so the
+-- table is refreshed by a nightly task instead. Rebuild (and re-run the
+-- task once) whenever the default dictionary in nurse_practitioner_search.py
+-- changes; the app keeps its scan-based path because the UI lets users edit
+-- the keyword lists at runtime, which the index cannot anticipate.
+
+CREATE TABLE IF NOT EXISTS userprofiles.public.np_keyword_hits (
+    RBID STRING,
+    MATCHED_KEYWORDS ARRAY
+);
+
+CREATE OR REPLACE TASK userprofiles.public.refresh_np_keyword_hits
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = 'USING CRON 0 4 * * * UTC'
+AS
+INSERT OVERWRITE INTO userprofiles.public.np_keyword_hits
+SELECT
+    c.RBID,
+    ARRAY_AGG(DISTINCT kw.VALUE::STRING) AS MATCHED_KEYWORDS
+FROM userprofiles.public.contact_search_dz c,
+     LATERAL FLATTEN(INPUT => PARSE_JSON('["nurse", "pmhnp", "remote",
+         "virtual", "online", "telepractice", "ehealth", "digital health",
+         "teleconsultation", "telemonitoring", "telemed", "telenursing",
+         "telepsychiatry", "telecardiology", "digital consultations",
+         "digital clinical"]')) kw
+WHERE COALESCE(c.JOB_IS_CURRENT, FALSE) = TRUE
+  AND CONTAINS(
+          LOWER(COALESCE(c.JOB_TITLE, '') || ' ' || COALESCE(c.JOB_FUNCTION, '')
+                || ' ' || COALESCE(c.JOB_DESCRIPTION, '') || ' '
+                || COALESCE(c.SKILLS, '') || ' ' || COALESCE(c.EDUCATION, '')
+                || ' ' || COALESCE(c.LINKEDIN_HEADLINE, '')),
+          kw.VALUE::STRING)
+GROUP BY c.RBID;
+
+ALTER TASK userprofiles.public.refresh_np_keyword_hits RESUME;